@@ -1,9 +1,14 @@
-from flask import Flask, render_template, url_for, flash, redirect, request
+from flask import Flask, render_template, url_for, flash, redirect, request, session
 from flask_login import LoginManager, login_user, current_user, logout_user, login_required
+from flask_session import Session
 from config import Config
 from forms import RegistrationForm, LoginForm, StudentForm
-from models import db, User, CLASSES, FILIERES
+from models import db, User, CLASS_LABELS, FILIERE_LABELS
 from functools import wraps
+from datetime import datetime
+import json
+from sqlalchemy import select
+from sqlalchemy.orm import raiseload, make_transient_to_detached
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -11,19 +16,58 @@ app.config.from_object(Config)
 # Initialisation DB
 db.init_app(app)
 
+# Sessions côté serveur (Redis)
+Session(app)
+
 # Gestion login
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 login_manager.login_message_category = 'info'
 
+# Cache des utilisateurs connectés dans Redis (partagé entre workers) : évite un SELECT par requête.
+# On y stocke un instantané des colonnes, jamais l'objet lié à la session SQLAlchemy d'une requête.
+USER_CACHE_TTL = 60
+
+def _user_cache_key(user_id):
+    return f"user:{user_id}"
+
+def cache_user(user):
+    # Jamais le hachage du mot de passe : il sera rechargé à la demande s'il est lu
+    data = {
+        column.name: getattr(user, column.name)
+        for column in User.__table__.columns if column.name != 'password_hash'
+    }
+    data['date_registered'] = data['date_registered'].isoformat()
+    app.config['SESSION_REDIS'].setex(_user_cache_key(user.id), USER_CACHE_TTL, json.dumps(data))
+
+def uncache_user(user_id):
+    app.config['SESSION_REDIS'].delete(_user_cache_key(user_id))
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
-
-# Créer l'admin par défaut
-with app.app_context():
+    user_id = int(user_id)
+    cached = app.config['SESSION_REDIS'].get(_user_cache_key(user_id))
+    if cached is not None:
+        data = json.loads(cached)
+        data['date_registered'] = datetime.fromisoformat(data['date_registered'])
+        # Reconstruit un objet détaché puis le fusionne dans la session courante sans requête SQL
+        # (merge accepte une identité déjà présente dans la session, contrairement à add)
+        user = User(**data)
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+    user = db.session.get(User, user_id)
+    if user is not None:
+        cache_user(user)
+    return user
+
+# Initialisation de la base et de l'admin par défaut : à lancer une fois avec `flask init-db`
+@app.cli.command("init-db")
+def init_db():
     db.create_all()
-    if not User.query.filter_by(is_admin=True).first():
+    # create_all ne modifie pas une table existante : ajoute les index manquants
+    for index in User.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
+    if not db.session.query(db.exists().where(User.is_admin == True)).scalar():
         admin = User(
             username='admin',
             email='admin@example.com',
@@ -38,6 +82,12 @@ with app.app_context():
         db.session.commit()
         print("✅ Admin créé : admin / adminpassword")
 
+def another_admin_exists(user):
+    # SELECT ... LIMIT 1 : s'arrête au premier autre admin trouvé au lieu de tous les compter
+    return db.session.query(User.id).filter(
+        User.is_admin == True, User.id != user.id
+    ).limit(1).scalar() is not None
+
 # Décorateur admin
 def admin_required(f):
     @wraps(f)
@@ -84,7 +134,11 @@ def login():
     if form.validate_on_submit():
         user = User.query.filter_by(username=form.username.data).first()
         if user and user.check_password(form.password.data):
+            # Persiste un éventuel re-hachage effectué par check_password
+            db.session.commit()
             login_user(user)
+            # Nouvel identifiant de session après authentification (anti-fixation de session)
+            app.session_interface.regenerate(session)
             flash(f"Bienvenue {user.first_name} !", "success")
             return redirect(url_for('home'))
         else:
@@ -94,6 +148,7 @@ def login():
 @app.route("/logout")
 @login_required
 def logout():
+    uncache_user(current_user.id)
     logout_user()
     flash("Vous êtes déconnecté.", "info")
     return redirect(url_for('home'))
@@ -103,13 +158,19 @@ def students():
     # ✅ Version corrigée
     if current_user.is_authenticated:
         # Utilisateur connecté : voir tous les étudiants avec tous les champs
-        users = User.query.order_by(User.last_name.asc()).all()
+        users = db.session.execute(
+            select(User).order_by(User.last_name.asc()).options(raiseload('*'))
+        ).scalars().all()
         title = "Liste de tous les étudiants"
     else:
         # Utilisateur non connecté : voir tous les étudiants mais seulement les infos de base
-        users = User.query.order_by(User.last_name.asc()).all()
+        # (projection des seules colonnes affichées, sans construire d'objets User)
+        users = db.session.execute(
+            select(User.id, User.first_name, User.last_name, User.class_level, User.filiere)
+            .order_by(User.last_name.asc())
+        ).all()
         title = "Liste des étudiants - Connectez-vous pour plus de détails"
-    return render_template("etudiants.html", title=title, users=users, CLASSES=CLASSES, FILIERES=FILIERES)
+    return render_template("etudiants.html", title=title, users=users, CLASS_LABELS=CLASS_LABELS, FILIERE_LABELS=FILIERE_LABELS)
 
 # === AJOUTER ÉTUDIANT ===
 @app.route("/ajouter", methods=['GET', 'POST'])
@@ -148,6 +209,7 @@ def modifier_etudiants(user_id):
         user.filiere = form.filiere.data
         user.is_admin = form.is_admin.data
         db.session.commit()
+        uncache_user(user_id)
         flash("Étudiant mis à jour avec succès !", "success")
         return redirect(url_for("students"))
     return render_template("modifier_etudiants.html", title="Modifier un étudiant", form=form, legend="Modifier un étudiant")
@@ -157,11 +219,12 @@ def modifier_etudiants(user_id):
 @admin_required
 def delete_student(user_id):
     user = User.query.get_or_404(user_id)
-    if user.is_admin and User.query.filter_by(is_admin=True).count() == 1:
+    if user.is_admin and not another_admin_exists(user):
         flash("Impossible de supprimer le seul administrateur.", "danger")
         return redirect(url_for("students"))
     db.session.delete(user)
     db.session.commit()
+    uncache_user(user_id)
     flash("Étudiant supprimé avec succès !", "success")
     return redirect(url_for("students"))
 
@@ -169,7 +232,7 @@ def delete_student(user_id):
 @app.route("/profil")
 @login_required
 def profil():
-    return render_template("etudiants.html", title="Mon profil", users=[current_user], CLASSES=CLASSES, FILIERES=FILIERES)
+    return render_template("etudiants.html", title="Mon profil", users=[current_user], CLASS_LABELS=CLASS_LABELS, FILIERE_LABELS=FILIERE_LABELS)
 
 # === ADMIN PANEL ===
 @app.route("/admin")
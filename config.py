@@ -1,4 +1,5 @@
 import os
+import redis
 from dotenv import load_dotenv
 
 load_dotenv() # Charge les variables d'environnement du fichier .env
@@ -7,3 +8,22 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'une_cle_secrete_par_defaut_si_non_trouvee'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///site.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Pool de connexions pour les bases serveur (PostgreSQL, MySQL...) : plus de connexions
+    # simultanées, recyclage et vérification avant usage. SQLite garde le pool choisi par
+    # Flask-SQLAlchemy (StaticPool en mémoire refuse pool_size/max_overflow/pool_timeout).
+    SQLALCHEMY_ENGINE_OPTIONS = {} if SQLALCHEMY_DATABASE_URI.startswith('sqlite:') else {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 3600)),
+        'pool_timeout': 20,
+        'pool_pre_ping': True
+    }
+    # Met en cache les vérifications de mot de passe réussies (5 min) pour éviter de recalculer Argon2.
+    # Désactivé par défaut : les empreintes SHA-256 gardées en mémoire sont bien moins coûteuses à attaquer.
+    USE_VERIFY_PASSWORD_CACHE = os.environ.get('USE_VERIFY_PASSWORD_CACHE', 'False').lower() == 'true'
+    # Sessions côté serveur dans Redis : le cookie ne contient plus que l'identifiant de session
+    SESSION_TYPE = 'redis'
+    SESSION_REDIS = redis.from_url(os.environ.get('REDIS_URL') or 'redis://localhost:6379/0')
+    SESSION_PERMANENT = False
+    # Jeton CSRF valable toute la durée de la session (Flask-WTF le met déjà en cache sur g par requête)
+    WTF_CSRF_TIME_LIMIT = None
@@ -1,7 +1,30 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SubmitField, SelectField, BooleanField
-from wtforms.validators import DataRequired, Length, Email, EqualTo, ValidationError
-from models import User, CLASSES, FILIERES
+from wtforms.validators import DataRequired, Length, Email, EqualTo
+from sqlalchemy import select, or_
+from models import db, User, CLASSES, FILIERES
+
+# Vérifie l'unicité du nom d'utilisateur et de l'email en une seule requête
+def check_unique_identity(username_field, email_field, check_username=True, check_email=True):
+    # Comme les anciens validateurs inline : pas de requête pour un champ déjà invalide
+    check_username = check_username and not username_field.errors
+    check_email = check_email and not email_field.errors
+    conditions = []
+    if check_username:
+        conditions.append(User.username == username_field.data)
+    if check_email:
+        conditions.append(User.email == email_field.data)
+    if not conditions:
+        return True
+    rows = db.session.execute(select(User.username, User.email).where(or_(*conditions)).limit(2)).all()
+    valid = True
+    if check_username and any(row.username == username_field.data for row in rows):
+        username_field.errors.append('Ce nom d\'utilisateur est déjà pris.')
+        valid = False
+    if check_email and any(row.email == email_field.data for row in rows):
+        email_field.errors.append('Cet email est déjà enregistré.')
+        valid = False
+    return valid
 
 class RegistrationForm(FlaskForm):
     first_name = StringField('Prénom', validators=[DataRequired(), Length(min=2, max=50)])
@@ -14,15 +37,9 @@ class RegistrationForm(FlaskForm):
     confirm_password = PasswordField('Confirmer le mot de passe', validators=[DataRequired(), EqualTo('password')])
     submit = SubmitField('S\'inscrire')
 
-    def validate_username(self, username):
-        user = User.query.filter_by(username=username.data).first()
-        if user:
-            raise ValidationError('Ce nom d\'utilisateur est déjà pris.')
-
-    def validate_email(self, email):
-        user = User.query.filter_by(email=email.data).first()
-        if user:
-            raise ValidationError('Cet email est déjà enregistré.')
+    def validate(self, extra_validators=None):
+        valid = super(RegistrationForm, self).validate(extra_validators)
+        return check_unique_identity(self.username, self.email) and valid
 
 class LoginForm(FlaskForm):
     username = StringField('Nom d\'utilisateur', validators=[DataRequired()])
@@ -44,14 +61,10 @@ class StudentForm(FlaskForm):
         self.original_username = original_username
         self.original_email = original_email
 
-    def validate_username(self, username):
-        if username.data != self.original_username:
-            user = User.query.filter_by(username=username.data).first()
-            if user:
-                raise ValidationError('Ce nom d\'utilisateur est déjà pris.')
-
-    def validate_email(self, email):
-        if email.data != self.original_email:
-            user = User.query.filter_by(email=email.data).first()
-            if user:
-                raise ValidationError('Cet email est déjà enregistré.')
+    def validate(self, extra_validators=None):
+        valid = super(StudentForm, self).validate(extra_validators)
+        return check_unique_identity(
+            self.username, self.email,
+            check_username=self.username.data != self.original_username,
+            check_email=self.email.data != self.original_email
+        ) and valid
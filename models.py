@@ -1,27 +1,60 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
 from flask_login import UserMixin
+from sqlalchemy import insert
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from cachetools import TTLCache
 
 db = SQLAlchemy()
 
-# Définition des choix pour la classe et la filière
-CLASSES = [
+# Hachage Argon2id (profil OWASP : 64 Mio, 3 itérations, 1 thread)
+_ph = PasswordHasher(time_cost=3, memory_cost=64 * 1024, parallelism=1)
+
+# Vérifications réussies récentes, indexées par (hachage, mot de passe) : évite de relancer le KDF
+_verify_cache = TTLCache(maxsize=1024, ttl=300)
+_verify_cache_lock = threading.Lock()  # TTLCache n'est pas thread-safe
+
+# Hachages simultanés dans User.bulk_create (64 Mio chacun) : borne la mémoire d'un import
+BULK_HASH_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def _verify_cache_key(password_hash, password):
+    return hashlib.sha256(password_hash.encode() + b"|" + password.encode()).digest()
+
+
+# Définition des choix pour la classe et la filière (tuples immuables partagés par les formulaires)
+CLASSES = (
     ('L1', 'Licence 1'),
     ('L2', 'Licence 2'),
     ('L3', 'Licence 3'),
     ('M1', 'Master 1'),
     ('M2', 'Master 2')
-]
+)
 
-FILIERES = [
+FILIERES = (
     ('Informatique', 'Informatique'),
     ('Genie Logiciel', 'Génie Logiciel'),
     ('Reseaux', 'Réseaux et Télécoms'),
     ('Cybersecurite', 'Cybersécurité')
-]
+)
+
+# Libellés indexés par code, pour l'affichage sans boucle dans les templates
+CLASS_LABELS = dict(CLASSES)
+FILIERE_LABELS = dict(FILIERES)
 
 class User(db.Model, UserMixin):
+    __table_args__ = (
+        db.Index('ix_user_last_name', 'last_name'),
+        db.Index('ix_user_is_admin', 'is_admin'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(20), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -34,10 +67,56 @@ class User(db.Model, UserMixin):
     date_registered = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = _ph.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        if not current_app.config.get('USE_VERIFY_PASSWORD_CACHE', False):
+            return self._verify_password(password)
+        key = _verify_cache_key(self.password_hash, password)
+        with _verify_cache_lock:
+            if key in _verify_cache:
+                return True
+        if not self._verify_password(password):
+            return False
+        with _verify_cache_lock:
+            _verify_cache[key] = True
+        return True
+
+    def _verify_password(self, password):
+        # Anciens hachages Werkzeug (pbkdf2/scrypt) : vérifiés une fois puis migrés vers Argon2id
+        if not self.password_hash.startswith('$argon2'):
+            if not check_password_hash(self.password_hash, password):
+                return False
+            self.set_password(password)
+            return True
+        try:
+            _ph.verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+        if _ph.check_needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
+
+    @classmethod
+    def bulk_create(cls, records):
+        # Création en masse (imports, futur /admin/import-csv) : chaque dict doit contenir un champ
+        # 'password' en clair. Les hachages Argon2 sont calculés en parallèle (argon2-cffi libère le GIL)
+        # sur au plus BULK_HASH_WORKERS threads, chaque hachage réservant 64 Mio de mémoire,
+        # puis une seule requête INSERT multi-lignes contourne l'unit of work de l'ORM.
+        records = list(records)
+        for position, record in enumerate(records):
+            if 'password' not in record:
+                raise ValueError(f"Enregistrement {position} sans champ 'password'.")
+        if not records:
+            return
+        records = [dict(record) for record in records]
+        passwords = [record.pop('password') for record in records]
+        with ThreadPoolExecutor(max_workers=BULK_HASH_WORKERS) as executor:
+            hashes = executor.map(_ph.hash, passwords)
+            for record, password_hash in zip(records, hashes):
+                record['password_hash'] = password_hash
+        db.session.execute(insert(cls.__table__), records)
+        db.session.commit()
 
     def __repr__(self):
         return f"User('{self.username}', '{self.email}', Admin={self.is_admin})"
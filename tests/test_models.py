@@ -0,0 +1,35 @@
+import pytest
+from flask import Flask
+from models import db, User
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def test_bulk_create_hashes_passwords_and_applies_defaults(app):
+    User.bulk_create([
+        {'username': 'jdupont', 'email': 'j@example.com', 'password': 'secret1',
+         'first_name': 'Jean', 'last_name': 'Dupont', 'class_level': 'L1', 'filiere': 'Informatique'},
+        {'username': 'amartin', 'email': 'a@example.com', 'password': 'secret2',
+         'first_name': 'Alice', 'last_name': 'Martin', 'class_level': 'M1', 'filiere': 'Reseaux'},
+    ])
+    users = User.query.order_by(User.username).all()
+    assert [user.username for user in users] == ['amartin', 'jdupont']
+    for user in users:
+        assert user.password_hash.startswith('$argon2id$')
+        assert user.is_admin is False
+        assert user.date_registered is not None
+    assert users[1].check_password('secret1')
+
+
+def test_bulk_create_requires_password(app):
+    with pytest.raises(ValueError):
+        User.bulk_create([{'username': 'jdupont', 'email': 'j@example.com'}])
+    assert User.query.count() == 0